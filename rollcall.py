@@ -1,39 +1,149 @@
 #!/usr/bin/env python3
 
 import argparse
+import asyncio
+import concurrent.futures
+import errno
+import functools
 import ipaddress
 import subprocess
 import socket
-import concurrent.futures
+import struct
 import platform
 import os
+import shutil
+import sys
+from collections.abc import Iterator
 from pathlib import Path
 
-def ping_host(ip: str, ping_base_cmd: list[str], timeout: float = 2.0) -> bool:
+try:
+    import icmplib
+except ImportError:  # optional: fall back to the system ping command
+    icmplib = None
+
+try:
+    import resource
+except ImportError:  # Windows: no RLIMIT_NOFILE
+    resource = None
+
+# Ping backend, chosen once at startup by select_ping_impl(): "icmplib" or "subprocess"
+_PING_IMPL = "subprocess"
+
+# Base argv for the system ping command. main encodes it to bytes on POSIX
+# (str on Windows); _ping_once matches the IP argument to whichever it gets.
+PingCommand = list[str] | list[bytes]
+
+# Seconds a single ping waits for a reply (also the ping -W / -w value in main)
+REPLY_TIMEOUT = 1
+
+# Errors from socket/process creation: the ping never went out
+PING_SETUP_ERRORS = (OSError, icmplib.ICMPLibError) if icmplib is not None else (OSError,)
+
+# EMFILE and friends: resources run out now but free up as pings finish
+_TRANSIENT_ERRNOS = {errno.EMFILE, errno.ENFILE, errno.EAGAIN, errno.ENOMEM}
+PING_ATTEMPTS = 4
+
+# File descriptors left free for stdio, the event loop and the DNS pool's lookups
+FD_HEADROOM = 128
+
+def select_ping_impl() -> str:
+    """Use icmplib's unprivileged ICMP sockets if usable, else the system ping command."""
+    global _PING_IMPL
+    _PING_IMPL = "subprocess"
+    if icmplib is not None:
+        try:
+            icmplib.ping("127.0.0.1", count=1, timeout=1, privileged=False)
+            _PING_IMPL = "icmplib"
+        except icmplib.ICMPLibError:
+            # SocketPermissionError: the OS does not allow unprivileged ICMP sockets
+            pass
+    return _PING_IMPL
+
+def clamp_to_fd_limit(workers: int) -> int:
+    """Lower workers to fit the open-file soft limit: every ping in flight holds an fd
+    (an icmplib socket, or the child's pidfd/pipes), and EMFILE would look like a dead host.
+    """
+    if resource is None:
+        return workers
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return workers
+    headroom = min(FD_HEADROOM, soft // 2)
+    return max(1, min(workers, soft - headroom))
+
+async def _ping_once(ip: str, ping_base_cmd: PingCommand, timeout: float) -> bool:
+    if _PING_IMPL == "icmplib":
+        # async_ping handles send/receive errors itself; what escapes is socket creation failing
+        host = await icmplib.async_ping(ip, count=1, timeout=REPLY_TIMEOUT, privileged=False)
+        return host.is_alive
+
+    # A pre-encoded base command (POSIX, see main) takes the IP as bytes too
+    ip_arg = ip.encode('ascii') if isinstance(ping_base_cmd[0], bytes) else ip
+    proc = await asyncio.create_subprocess_exec(
+        *ping_base_cmd, ip_arg,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        # Our fds are non-inheritable (PEP 446), so skipping the close_fds pass is
+        # safe, and with an absolute ping path it lets subprocess use posix_spawn
+        close_fds=False
+    )
+
     try:
-        output = subprocess.run(
-            ping_base_cmd + [ip],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            timeout=timeout
-        )
-        return output.returncode == 0
-    except Exception:
+        return await asyncio.wait_for(proc.wait(), timeout) == 0
+    except asyncio.TimeoutError:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+        await proc.wait()
         return False
 
+def _is_transient(err: Exception) -> bool:
+    """True if err means the system was briefly out of fds/processes, so a retry may work."""
+    if isinstance(err, OSError):
+        return err.errno in _TRANSIENT_ERRNOS
+    # icmplib turns the OSError into a message-only ICMPSocketError
+    return isinstance(err, icmplib.ICMPSocketError) and not isinstance(
+        err, (icmplib.SocketPermissionError, icmplib.SocketAddressError))
+
+async def ping_host(ip: str, ping_base_cmd: PingCommand, timeout: float = 2.0) -> bool:
+    """True if ip answered. Raises one of PING_SETUP_ERRORS if the ping could not be
+    sent at all (socket or process creation failed); that says nothing about the host.
+    """
+    for attempt in range(PING_ATTEMPTS):
+        try:
+            return await _ping_once(ip, ping_base_cmd, timeout)
+        except PING_SETUP_ERRORS as err:
+            if attempt == PING_ATTEMPTS - 1 or not _is_transient(err):
+                raise
+        # Out of fds or processes: back off while other pings finish and free them
+        # (0.25, 0.5, 1 reply timeouts: together longer than a ping holds its fd)
+        await asyncio.sleep(REPLY_TIMEOUT / 4 * 2 ** attempt)
+
+@functools.lru_cache(maxsize=16384)
+def _resolve_dns(ip: str) -> str:
+    """PTR lookup for ip (short hostname), else IP. Cached: overlapping networks ask twice."""
+    try:
+        hostname, _, _ = socket.gethostbyaddr(ip)
+        return hostname.split('.')[0]
+    except Exception:
+        return ip
+
 def resolve_host(ip: str, host_labels: dict, use_dns: bool) -> str:
     """Resolve IP to name using local host_labels first, then DNS (optional), else IP."""
-    if ip in host_labels:
-        return host_labels[ip]
+    name = host_labels.get(ip)
+    if name is not None:
+        return name
 
     if not use_dns:
         return ip
 
-    try:
-        hostname, _, _ = socket.gethostbyaddr(ip)
-        return hostname.split('.')[0]
-    except Exception:
-        return ip
+    return _resolve_dns(ip)
+
+@functools.lru_cache(maxsize=256)
+def _ip_network(cidr: str) -> ipaddress.IPv4Network:
+    """ipaddress.ip_network, tolerating host bits (10.0.0.5/24) and memoized."""
+    return ipaddress.ip_network(cidr, strict=False)
 
 def parse_networks(networks_arg: str) -> list[ipaddress.IPv4Network]:
     """Parse the comma-separated network CIDR strings."""
@@ -41,7 +151,7 @@ def parse_networks(networks_arg: str) -> list[ipaddress.IPv4Network]:
     parsed_networks = []
     for net in networks:
         try:
-            parsed = ipaddress.ip_network(net.strip(), strict=False)
+            parsed = _ip_network(net)
             parsed_networks.append(parsed)
         except ValueError as e:
             print(f"Warning: Skipping invalid network '{net}': {e}")
@@ -110,7 +220,7 @@ def load_resolve_file(path: str) -> tuple[dict, dict]:
                 cidr = parts[0]
                 label = " ".join(parts[1:]).strip()
                 try:
-                    net = ipaddress.ip_network(cidr, strict=False)
+                    net = _ip_network(cidr)
                     net_labels[net] = label
                 except ValueError:
                     continue
@@ -133,26 +243,228 @@ def load_resolve_file(path: str) -> tuple[dict, dict]:
 
     return net_labels, host_labels
 
-def scan_network(network: ipaddress.IPv4Network, resolve: bool, ping_base_cmd: list[str], host_labels: dict) -> list:
-    """Scan hosts in the given network, return sorted list of display strings."""
-    entries = []
+def _host_range(network: ipaddress.IPv4Network) -> tuple[int, int]:
+    """First and last address, as ints, that network.hosts() yields."""
+    lo = int(network.network_address)
+    hi = int(network.broadcast_address)
+    if network.prefixlen < network.max_prefixlen - 1:
+        # Like hosts(): skip the network address, and for IPv4 the broadcast address.
+        # /31 and /32 (or /127 and /128) use every address.
+        lo += 1
+        if network.version == 4:
+            hi -= 1
+    return lo, hi
+
+def _host_count(network: ipaddress.IPv4Network) -> int:
+    """Number of addresses network.hosts() yields, without iterating it."""
+    lo, hi = _host_range(network)
+    return hi - lo + 1
+
+def _iter_host_strings(network: ipaddress.IPv4Network) -> Iterator[str]:
+    """Yield the addresses of network.hosts() as strings, without an address object per host."""
+    if network.version != 4:
+        yield from (str(host) for host in network.hosts())
+        return
+
+    lo, hi = _host_range(network)
+    pack = struct.Struct('>I').pack
+    ntoa = socket.inet_ntoa
+    for n in range(lo, hi + 1):
+        yield ntoa(pack(n))
+
+async def scan_network(network: ipaddress.IPv4Network, resolve: bool, ping_base_cmd: PingCommand, host_labels: dict,
+                       dns_pool: concurrent.futures.Executor | None = None, workers: int | None = None) -> list:
+    """Scan hosts in the given network, return (display, ip) for each live host.
+    workers fixes the number of concurrent pings; by default it starts at the host
+    count (4..512) and grows while most pings time out (up to 1024).
+    PTR lookups (resolve=True) run on dns_pool, or the loop's default executor if None.
+    """
+    host_count = _host_count(network)
+    # Without an explicit --workers, the pool resizes itself as the scan runs
+    adaptive = workers is None
+    if workers is None:
+        workers = min(512, max(4, host_count))
+    workers = clamp_to_fd_limit(workers)
+    max_workers = clamp_to_fd_limit(1024)
+
+    loop = asyncio.get_running_loop()
+    hosts = _iter_host_strings(network)
+    alive = []
+    lookups = []
+    tasks = []
+    target = workers
+    failures = []
+    active = 0
+    completed = 0
+    timed_out = 0
+
+    def found(ip: str):
+        alive.append(ip)
+        if resolve:
+            # PTR lookups block: hand them to the DNS pool and keep pinging meanwhile
+            lookups.append(loop.run_in_executor(dns_pool, resolve_host, ip, host_labels, True))
+
+    async def probe(ip: str):
+        try:
+            if await ping_host(ip, ping_base_cmd):
+                found(ip)
+        except PING_SETUP_ERRORS as err:
+            # The ping never went out: report it instead of calling the host down
+            failures.append((ip, err))
+
+    def spawn(count: int):
+        nonlocal active
+        for _ in range(count):
+            active += 1
+            tasks.append(loop.create_task(worker()))
+
+    def resize():
+        # Unreachable hosts hold a worker for the full reply timeout while live
+        # ones answer in milliseconds: grow when timeouts dominate, and give the
+        # growth back once replies stream in. Never shrink below the starting
+        # size: fast replies don't tie up a worker, so fewer workers save nothing
+        # and would leave the remaining dead hosts queued behind them
+        nonlocal target
+        ratio = timed_out / completed
+        if ratio > 0.8:
+            grown = min(max_workers, host_count, target * 2)
+            if grown > target:
+                # After a shrink, workers above the old target may not have retired
+                # yet: count them, so growth never exceeds the cap
+                spawn(max(0, grown - active))
+                target = grown
+        elif ratio < 0.1 and target > workers:
+            target = max(workers, target // 2)
+
+    async def worker():
+        # Workers pull from one shared iterator: at most `target` pings are in
+        # flight and the host list is never materialized
+        nonlocal active, completed, timed_out
+        try:
+            for ip in hosts:
+                started = loop.time()
+                await probe(ip)
+
+                if not adaptive:
+                    continue
+                completed += 1
+                if loop.time() - started >= 0.9 * REPLY_TIMEOUT:
+                    timed_out += 1
+                if completed == 100:
+                    resize()
+                    completed = timed_out = 0
+                if active > target:
+                    return  # pool is shrinking: retire this worker
+        finally:
+            active -= 1
+
+    if host_count <= 2:
+        # /30, /31 and /32 (/127 and /128 for IPv6): ping directly, the worker pool
+        # and its controller would cost more.
+        # Still concurrently, so two unreachable hosts take one timeout, not two.
+        await asyncio.gather(*(probe(ip) for ip in hosts))
+    else:
+        spawn(workers)
+        # Workers may spawn more workers, so drain until none are left
+        while tasks:
+            await tasks.pop()
+
+    if failures:
+        ip, err = failures[0]
+        print(f"Warning: {len(failures)} host(s) in {network} could not be pinged and are not listed "
+              f"(e.g. {ip}: {err})")
+
+    if resolve:
+        displays = await asyncio.gather(*lookups)
+    else:
+        displays = [resolve_host(ip, host_labels, False) for ip in alive]
+
+    return list(zip(displays, alive))
+
+def sort_hosts(entries: list, version: int) -> list:
+    """Order (display, ip) entries for display: names alphabetically, then bare IPs by address."""
+    # Split into named and bare-IP hosts in one pass, keeping only the part each sort needs
+    named = []
+    unnamed = []
+    for display, ip in entries:
+        if display != ip:
+            named.append(display)
+        else:
+            unnamed.append(ip)
+
+    named.sort(key=str.lower)
+    # Packed addresses are fixed-width big-endian bytes, so they sort numerically
+    family = socket.AF_INET6 if version == 6 else socket.AF_INET
+    unnamed.sort(key=lambda ip: socket.inet_pton(family, ip))
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=100) as executor:
-        futures = {executor.submit(ping_host, str(host), ping_base_cmd): str(host) for host in network.hosts()}
+    return named + unnamed
 
-        for future in concurrent.futures.as_completed(futures):
-            ip = futures[future]
-            if future.result():
-                display = resolve_host(ip, host_labels, resolve)
-                entries.append((display, ip))
+def collapse_networks(networks: list) -> list:
+    """Merge overlapping and adjacent networks (per IP version) into the fewest covering networks."""
+    return [net for version in (4, 6)
+            for net in ipaddress.collapse_addresses(n for n in networks if n.version == version)]
 
-    named = [(d, ip) for (d, ip) in entries if d != ip]
-    unnamed = [(d, ip) for (d, ip) in entries if d == ip]
+def plan_scans(networks: list) -> list:
+    """Networks to actually ping for the requested ones.
+    Overlapping networks are merged into their collapsed supernet, but only when the
+    supernet's hosts() range covers theirs: a /31 or /32 can list the supernet's own
+    network or broadcast address, which the supernet scan never pings.
+    """
+    collapsed = collapse_networks(networks)
+    if len(collapsed) >= len(networks):
+        # Nothing overlaps or touches: scan the networks as given
+        return list(networks)
 
-    named_sorted = sorted(named, key=lambda x: x[0].lower())
-    unnamed_sorted = sorted(unnamed, key=lambda x: ipaddress.ip_address(x[1]))
+    scan_set = []
+    for net in networks:
+        supernet = next(s for s in collapsed if s.version == net.version and net.subnet_of(s))
+        lo, hi = _host_range(net)
+        super_lo, super_hi = _host_range(supernet)
+        target = supernet if super_lo <= lo and hi <= super_hi else net
+        if target not in scan_set:
+            scan_set.append(target)
+    return scan_set
+
+async def scan_networks(networks: list, resolve: bool, ping_base_cmd: PingCommand, host_labels: dict, workers: int | None, verbose: bool) -> dict:
+    """Scan all networks on one event loop, with one DNS pool shared by all of them.
+    Overlapping networks are merged first so no address is pinged twice; each
+    requested network still gets its own sorted list of display strings.
+    """
+    scan_set = plan_scans(networks)
+
+    scanned = {}
+    # Threads are only started once a lookup is submitted, i.e. with --resolve
+    with concurrent.futures.ThreadPoolExecutor(max_workers=64, thread_name_prefix='dns') as dns_pool:
+        for net in scan_set:
+            if verbose:
+                if net in networks:
+                    print(f'Scanning network {net.network_address}/{net.prefixlen}...')
+                else:
+                    # A merged scan the user never asked for: name what it stands in for
+                    covered = ', '.join(str(n) for n in networks
+                                        if n not in scan_set and n.version == net.version and n.subnet_of(net))
+                    print(f'Scanning {net.network_address}/{net.prefixlen} (covers {covered})...')
+            scanned[net] = await scan_network(net, resolve, ping_base_cmd, host_labels, dns_pool, workers)
 
-    return [d for (d, _) in named_sorted + unnamed_sorted]
+    results = {}
+    live = None
+    for net in networks:
+        if net in scanned:
+            entries = scanned[net]
+        else:
+            # net was merged into a larger scan: keep only the hosts within its own range
+            if live is None:
+                # Keyed by IP: an address can be in more than one scanned network
+                live = {}
+                for hits in scanned.values():
+                    for display, ip in hits:
+                        addr = ipaddress.ip_address(ip)
+                        live[ip] = (display, addr.version, int(addr))
+            lo, hi = _host_range(net)
+            entries = [(display, ip) for ip, (display, version, n) in live.items()
+                       if version == net.version and lo <= n <= hi]
+        results[net] = sort_hosts(entries, net.version)
+    return results
 
 def print_table(networks, results, netnames, net_labels):
     """Print the results as a table with columns for each network."""
@@ -162,8 +474,11 @@ def print_table(networks, results, netnames, net_labels):
     # Define a fixed width per column (tab size) to support up to 5 networks on most screens
     col_width = 25
 
+    # One template for every line: each cell left-aligned and padded to col_width
+    row_fmt = ' | '.join([f'{{:<{col_width}}}'] * len(networks))
+
     # Print header with network names if provided
-    header_parts = []
+    titles = []
     for idx, net in enumerate(networks):
         title = f'{net.network_address}/{net.prefixlen}'
 
@@ -173,23 +488,40 @@ def print_table(networks, results, netnames, net_labels):
         elif idx < len(netnames) and netnames[idx]:
             title += " " + netnames[idx]
 
-        header_parts.append(title.ljust(col_width))
-    header = ' | '.join(header_parts)
-
-    print(header)
-
-    print('-' * (col_width * len(networks) + 3 * (len(networks) - 1)))
-
-    # Print rows
-    for i in range(max_len):
-        row = []
-        for net in networks:
-            hosts = results[net]
-            if i < len(hosts):
-                row.append(hosts[i].ljust(col_width))
-            else:
-                row.append(''.ljust(col_width))
-        print(' | '.join(row))
+        titles.append(title)
+
+    lines = [row_fmt.format(*titles), '-' * (col_width * len(networks) + 3 * (len(networks) - 1))]
+
+    # Build rows: pad every column to max_len so rows are a plain zip across columns
+    columns = [results[net] + [''] * (max_len - len(results[net])) for net in networks]
+    lines.extend(row_fmt.format(*row) for row in zip(*columns))
+
+    # One write for the whole table rather than a print() per row
+    buffer = getattr(sys.stdout, 'buffer', None)
+    if buffer is None:
+        # stdout replaced by a text-only stream
+        sys.stdout.write('\n'.join(lines) + '\n')
+        return
+
+    # Encode once and write the bytes directly, skipping the text layer.
+    # That layer would have translated newlines (CRLF on Windows), so use os.linesep.
+    # Names from rollcall.conf may be non-ASCII: use the stream's encoding.
+    table = os.linesep.join(lines) + os.linesep
+    data = table.encode(sys.stdout.encoding or 'utf-8', 'replace')
+    sys.stdout.flush()  # keep any earlier progress messages ahead of the table
+    buffer.write(data)
+    buffer.flush()
+
+def run_async(coro):
+    """asyncio.run(coro), on the IOCP-based proactor loop when on Windows.
+    Subprocesses (the ping fallback) are only supported by that loop there.
+    """
+    if platform.system() != "Windows":
+        return asyncio.run(coro)
+    if sys.version_info >= (3, 12):
+        return asyncio.run(coro, loop_factory=asyncio.ProactorEventLoop)
+    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+    return asyncio.run(coro)
 
 def main():
     parser = argparse.ArgumentParser(description='Lightweight network roll-call: show which hosts are up across one or more networks.')
@@ -198,20 +530,38 @@ def main():
     parser.add_argument('--netnames', type=str, default='', help='Comma-separated network names (fallback if rollcall.conf has no labels).')
     parser.add_argument('--no-resolve-file', action='store_true', help='Ignore rollcall.conf even if present.')
     parser.add_argument('-v', '--verbose', action='store_true', help='Show scan progress messages.')
+    parser.add_argument('--workers', type=int, default=None, help='Fixed number of concurrent pings per network (default: adaptive, starting at the number of hosts, between 4 and 512).')
     args = parser.parse_args()
 
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
     resolve_path = find_resolve_file(args.no_resolve_file)
     net_labels = {}
     host_labels = {}
     if resolve_path:
         net_labels, host_labels = load_resolve_file(resolve_path)
 
+    select_ping_impl()
+
     system = platform.system()
 
     if system == "Windows":
-        ping_base_cmd = ["ping", "-n", "1", "-w", "1000"]
+        # Windows ping does no reverse lookup unless asked to with -a
+        ping_base_cmd = ["ping", "-n", "1", "-w", str(REPLY_TIMEOUT * 1000)]
     else:
-        ping_base_cmd = ["ping", "-c", "1", "-W", "1"]
+        # -n: numeric output only, skip ping's own reverse name lookup
+        ping_base_cmd = ["ping", "-c", "1", "-W", str(REPLY_TIMEOUT), "-n"]
+
+    # Spawning by absolute path avoids a PATH search per ping and is required for
+    # subprocess's posix_spawn fast path
+    ping_path = shutil.which(ping_base_cmd[0])
+    if ping_path:
+        ping_base_cmd[0] = ping_path
+
+    if os.name == 'posix':
+        # Encode the argv once instead of letting subprocess fsencode it for every ping
+        ping_base_cmd = [os.fsencode(arg) for arg in ping_base_cmd]
 
     # Decide which networks to scan
     if args.networks:
@@ -226,11 +576,7 @@ def main():
         else:
             parser.error("networks is required unless rollcall.conf contains a [networks] section")
 
-    results = {}
-    for net in networks:
-        if args.verbose:
-            print(f'Scanning network {net.network_address}/{net.prefixlen}...')
-        results[net] = scan_network(net, args.resolve, ping_base_cmd, host_labels)
+    results = run_async(scan_networks(networks, args.resolve, ping_base_cmd, host_labels, args.workers, args.verbose))
     # Parse network names if provided
     netnames = [name.strip() for name in args.netnames.split(',')] if args.netnames else []
 
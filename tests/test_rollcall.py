@@ -0,0 +1,70 @@
+import asyncio
+import ipaddress
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import rollcall
+
+
+def scan(cidrs, up):
+    """Run scan_networks over cidrs with a stub ping that answers for the IPs in up."""
+    pinged = []
+
+    async def fake_ping(ip, ping_base_cmd, timeout=2.0):
+        pinged.append(ip)
+        return ip in up
+
+    networks = [ipaddress.ip_network(c) for c in cidrs]
+    with mock.patch.object(rollcall, "ping_host", fake_ping):
+        results = asyncio.run(rollcall.scan_networks(networks, False, [], {}, None, False))
+    return [results[net] for net in networks], pinged
+
+
+class ScanNetworksTest(unittest.TestCase):
+    def test_point_to_point_inside_supernet_keeps_network_address(self):
+        columns, _ = scan(["10.0.0.0/24", "10.0.0.0/32"], {"10.0.0.0", "10.0.0.7"})
+        self.assertEqual(columns, [["10.0.0.7"], ["10.0.0.0"]])
+
+    def test_adjacent_31s_keep_their_edge_addresses(self):
+        columns, _ = scan(["10.0.0.0/31", "10.0.0.2/31"], {"10.0.0.0", "10.0.0.3"})
+        self.assertEqual(columns, [["10.0.0.0"], ["10.0.0.3"]])
+
+    def test_overlapping_networks_are_pinged_once(self):
+        columns, pinged = scan(["10.0.0.0/24", "10.0.0.0/28"], {"10.0.0.1", "10.0.0.20"})
+        self.assertEqual(columns, [["10.0.0.1", "10.0.0.20"], ["10.0.0.1"]])
+        self.assertEqual(len(pinged), len(set(pinged)))
+        self.assertEqual(len(pinged), 254)
+
+    def test_mostly_live_network_is_not_throttled(self):
+        # Live hosts answer at once and fill every completion window with
+        # non-timeouts; the pool must not shrink below its starting size
+        # and leave the dead hosts queued behind a few workers
+        in_flight = 0
+        peak = 0
+
+        async def fake_ping(ip, ping_base_cmd, timeout=2.0):
+            nonlocal in_flight, peak
+            if not ip.endswith("0"):
+                return True
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(rollcall.REPLY_TIMEOUT)
+            in_flight -= 1
+            return False
+
+        network = ipaddress.ip_network("10.0.0.0/22")
+        with mock.patch.object(rollcall, "ping_host", fake_ping), \
+                mock.patch.object(rollcall, "REPLY_TIMEOUT", 0.05):
+            entries = asyncio.run(rollcall.scan_network(network, False, [], {}))
+
+        dead = sum(1 for ip in rollcall._iter_host_strings(network) if ip.endswith("0"))
+        self.assertEqual(len(entries), rollcall._host_count(network) - dead)
+        self.assertEqual(peak, dead)
+
+
+if __name__ == "__main__":
+    unittest.main()